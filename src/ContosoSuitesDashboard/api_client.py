@@ -0,0 +1,88 @@
+"""Shared HTTP client for the Contoso Suites dashboard.
+
+Every page talks to the same Web API host, so all pages share a single
+pooled session. Reusing established TCP+TLS connections avoids paying a
+fresh handshake on every call, and the retry policy smooths over
+transient gateway errors from the App Service front end.
+"""
+
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# The dashboard makes many small JSON calls to a single host, so one pool
+# sized for burst traffic is enough; pool_block=False lets a burst beyond
+# pool_maxsize open extra connections rather than queue behind the pool.
+# Retries cover transient gateway errors on GETs and the JSON POSTs alike.
+_retry = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=frozenset(["GET", "POST"]),
+)
+_adapter = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=32,
+    pool_block=False,
+    max_retries=_retry,
+)
+
+session = requests.Session()
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+session.headers.update({
+    "Content-Type": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+})
+
+# In-flight request registry for coalescing duplicate calls.
+_executor = ThreadPoolExecutor(max_workers=8)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def coalesce(key, fn):
+    """Deduplicate concurrent identical calls keyed on their arguments.
+
+    st.cache_data only sees a second identical call once the first has
+    returned, so a double-click still fires two network requests. This
+    registry lets the second caller wait on the first caller's in-flight
+    future instead: N concurrent duplicates cost one request. Exceptions
+    propagate to every waiter through the shared future."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = _executor.submit(fn)
+            _inflight[key] = future
+    try:
+        return future.result()
+    finally:
+        with _inflight_lock:
+            if _inflight.get(key) is future:
+                del _inflight[key]
+
+@functools.lru_cache(maxsize=1)
+def get_api_endpoint():
+    """Retrieve API endpoint and ensure it includes 'https://'.
+
+    The endpoint never changes while the app is running, so the result is
+    memoized: the secrets lookup and string normalization run once per
+    process instead of once per API call."""
+    try:
+        api_endpoint = st.secrets["api"]["endpoint"].strip()
+        if not api_endpoint.startswith("http"):
+            api_endpoint = "https://" + api_endpoint.lstrip("/")
+
+        # ✅ Ensure API base URL includes `/api/`
+        if not api_endpoint.endswith("/api"):
+            api_endpoint = api_endpoint.rstrip("/") + "/api"
+
+        return api_endpoint
+    except KeyError:
+        st.error("🚨 API endpoint is missing in secrets.toml configuration.")
+        return ""
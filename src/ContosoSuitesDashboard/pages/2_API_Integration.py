@@ -1,34 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 import requests
 import streamlit as st
 
+from api_client import get_api_endpoint, session
+
 st.set_page_config(layout="wide")
 
-def get_api_endpoint():
-    """Retrieve API endpoint and ensure it includes 'https://'."""
-    try:
-        api_endpoint = st.secrets["api"]["endpoint"].strip()
-        if not api_endpoint.startswith("http"):
-            api_endpoint = "https://" + api_endpoint.lstrip("/")
-        
-        # ✅ Ensure API base URL includes `/api/`
-        if not api_endpoint.endswith("/api"):
-            api_endpoint = api_endpoint.rstrip("/") + "/api"
-
-        return api_endpoint
-    except KeyError:
-        st.error("🚨 API endpoint is missing in secrets.toml configuration.")
-        return ""
+# Resolve the endpoint and derived URLs once at import rather than on every call.
+API_BASE = get_api_endpoint()
+HOTELS_URL = f"{API_BASE}/Hotels"
+CHAT_URL = f"{API_BASE}/Chat"
+
+# Bound format method for the only URL that varies per call, so building it
+# is a single substitution instead of assembling an f-string each time.
+_BOOKINGS_URL = (API_BASE + "/Hotels/{}/Bookings").format
 
 @st.cache_data
 def get_hotels():
     """Return a list of hotels from the API with error handling."""
-    api_endpoint = get_api_endpoint()
-    if not api_endpoint:
+    if not API_BASE:
         return []
     try:
-        response = requests.get(f"{api_endpoint}/Hotels", timeout=30)
+        response = session.get(HOTELS_URL, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     except requests.exceptions.RequestException as e:
         st.error(f"🚨 Failed to fetch hotels: {e}")
         return []
@@ -36,40 +33,47 @@ def get_hotels():
 @st.cache_data
 def get_hotel_bookings(hotel_id):
     """Return a list of bookings for the specified hotel with error handling."""
-    api_endpoint = get_api_endpoint()
-    if not api_endpoint:
+    if not API_BASE:
         return []
     try:
-        response = requests.get(f"{api_endpoint}/Hotels/{hotel_id}/Bookings", timeout=30)
+        response = session.get(_BOOKINGS_URL(hotel_id), timeout=30)
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     except requests.exceptions.RequestException as e:
         st.error(f"🚨 Failed to fetch bookings for hotel {hotel_id}: {e}")
         return []
 
-def invoke_chat_endpoint(question):
-    """Invoke the chat endpoint with the specified question and handle errors."""
-    
-    api_endpoint = get_api_endpoint()
-    if not api_endpoint:
-        return "❌ API configuration error."
+@st.cache_data(ttl=3600, show_spinner=False)
+def _post_chat_question(question):
+    """Issue the chat POST and extract the reply, raising on HTTP errors.
+    Cached so asking the same question twice does not re-run the LLM call;
+    failures raise instead of returning, so they are never cached."""
+
+    # ✅ Ensure `message` is properly formatted
+    payload = {"message": question}
 
+    response = session.post(CHAT_URL, data=orjson.dumps(payload), timeout=30)
+    response.raise_for_status()
+
+    # ✅ Try parsing response as JSON; fallback to plain text
     try:
-        # ✅ Ensure `message` is properly formatted
-        payload = {"message": question}
-        headers = {"Content-Type": "application/json"}  # ✅ Fix: Use JSON format
+        data = orjson.loads(response.content)
+        if isinstance(data, dict):  # Ensure response is a dictionary
+            return data.get("message", "⚠️ No valid response received.")  # Extract message key if available
+        return f"⚠️ Unexpected API response format: {data}"  # Handle non-dictionary responses
+    except ValueError:
+        return f"⚠️ API returned invalid JSON: {response.text}"
 
-        response = requests.post(f"{api_endpoint}/Chat", json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
+def invoke_chat_endpoint(question):
+    """Invoke the chat endpoint with the specified question and handle errors.
+    Translates exceptions to user-facing messages outside the cached layer,
+    so a transient failure can be retried immediately."""
 
-        # ✅ Try parsing response as JSON; fallback to plain text
-        try:
-            data = response.json()
-            if isinstance(data, dict):  # Ensure response is a dictionary
-                return data.get("message", "⚠️ No valid response received.")  # Extract message key if available
-            return f"⚠️ Unexpected API response format: {data}"  # Handle non-dictionary responses
-        except ValueError:
-            return f"⚠️ API returned invalid JSON: {response.text}"
+    if not API_BASE:
+        return "❌ API configuration error."
+
+    try:
+        return _post_chat_question(question)
 
     except requests.exceptions.Timeout:
         return "🚨 Timeout Error: The Chat API took too long to respond."
@@ -99,6 +103,13 @@ def main():
         st.warning("⚠️ No hotels found. Check API configuration.")
         return
 
+    # Prefetch bookings for every hotel concurrently. get_hotel_bookings is
+    # cached, so this primes the cache and switching hotels in the selectbox
+    # no longer stalls on a serial round trip. All workers share the pooled
+    # session, so the requests reuse keep-alive connections to the API host.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(get_hotel_bookings, [hotel["hotelID"] for hotel in hotels_json]))
+
     hotels = [{"id": hotel["hotelID"], "name": hotel["hotelName"]} for hotel in hotels_json]
     selected_hotel = st.selectbox("🏨 Hotel:", hotels, format_func=lambda x: x["name"])
 
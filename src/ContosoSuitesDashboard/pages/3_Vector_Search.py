@@ -1,153 +1,174 @@
-import streamlit as st
-import requests
-import json
-import traceback  # ✅ Logs full error stack trace for debugging
-
-# Suppress insecure HTTPS warnings for local dev/self-signed certs
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-st.set_page_config(layout="wide")
-
-# ✅ Ensure API endpoint has "https://" and proper path prefix
-api_endpoint = st.secrets["api"]["endpoint"]
-if not api_endpoint.startswith("http"):
-    api_endpoint = "https://" + api_endpoint  # Automatically fix missing scheme
-
-# ✅ Ensure the API base URL is correct (many APIs use `/api/` prefix)
-vectorize_url = f"{api_endpoint}/api/Vectorize"
-vector_search_url = f"{api_endpoint}/api/VectorSearch"
-
-def handle_query_vectorization(query: str) -> list[float]:
-    """
-    Calls /api/Vectorize to convert the user's text query into a float vector.
-    """
-    try:
-        response = requests.get(
-            vectorize_url,
-            params={"text": query},
-            timeout=30,
-            verify=False
-        )
-
-        response.raise_for_status()  # Raise an exception for non-200 responses
-
-        vector = response.json()
-        if isinstance(vector, list) and all(isinstance(x, (int, float)) for x in vector):
-            return vector
-        else:
-            st.error("❌ API Error: /Vectorize returned an invalid format.")
-            return []
-    except requests.exceptions.Timeout:
-        st.error("🚨 Timeout Error: /Vectorize API took too long to respond.")
-    except requests.exceptions.ConnectionError:
-        st.error("🚨 Connection Error: Cannot reach the /Vectorize API.")
-    except requests.exceptions.RequestException as e:
-        st.error(f"🚨 API Error in /Vectorize: {str(e)}")
-        traceback.print_exc()
-    return []
-
-
-def handle_vector_search(query_vector_list: list[float], max_results: int, minimum_similarity_score: float):
-    """
-    Calls /api/VectorSearch with the vectorized query.
-    """
-    try:
-        if not query_vector_list:
-            st.error("🚨 Query vector is empty. Cannot proceed with /VectorSearch.")
-            return None
-
-        # ✅ Ensure valid JSON payload format
-        payload = {
-            "queryVector": [round(float(v), 6) for v in query_vector_list],  # Ensure floats are rounded to 6 decimals
-            "maxResults": max_results,
-            "minimumSimilarityScore": round(minimum_similarity_score, 2)  # Ensure float format
-        }
-        
-        headers = {"Content-Type": "application/json"}
-
-        response = requests.post(
-            vector_search_url,
-            json=payload,
-            headers=headers,
-            timeout=30,
-            verify=False
-        )
-
-        response.raise_for_status()  # Raise an exception for non-200 responses
-
-        data = response.json()
-        if isinstance(data, list):
-            return data
-        else:
-            st.error("❌ API Error: /VectorSearch returned an invalid format.")
-            return None
-    except requests.exceptions.Timeout:
-        st.error("🚨 Timeout Error: /VectorSearch API took too long to respond.")
-    except requests.exceptions.ConnectionError:
-        st.error("🚨 Connection Error: Cannot reach the /VectorSearch API.")
-    except requests.exceptions.RequestException as e:
-        st.error(f"🚨 API Error in /VectorSearch: {str(e)}")
-        traceback.print_exc()
-    return None
-
-
-def main():
-    """
-    Streamlit page for demonstrating vector search over maintenance requests.
-    """
-    st.title("🔍 Vector Search for Maintenance Requests")
-
-    st.write(
-        """
-        ## How It Works:
-        1️⃣ Enter a search query describing a maintenance issue.  
-        2️⃣ Click **"Submit"** to convert the query into a vector.  
-        3️⃣ The API will return **similar maintenance requests** with similarity scores.  
-        """
-    )
-
-    col1, col2 = st.columns(2)
-    with col1:
-        query = st.text_input("🔎 Enter Search Query:", key="query", value="")
-    with col2:
-        max_results = st.number_input("📊 Max results (0 = all):", min_value=0, value=5)
-
-    minimum_similarity_score = st.slider(
-        "📏 Minimum Similarity Score:",
-        min_value=0.0,
-        max_value=1.0,
-        value=0.8,  # ✅ Reset to production value
-        step=0.01
-    )
-
-    if st.button("🚀 Submit"):
-        if not query.strip():
-            st.warning("⚠️ Please enter a valid query.")
-            return
-
-        with st.spinner("🔄 Performing vector search..."):
-            try:
-                # ✅ Step 1: Convert query to vector
-                query_vector_list = handle_query_vectorization(query)
-
-                if not query_vector_list:
-                    st.error("🚨 No vector received from /Vectorize. Search cannot continue.")
-                    return
-
-                # ✅ Step 2: Call /VectorSearch with the vector
-                results = handle_vector_search(query_vector_list, max_results, minimum_similarity_score)
-
-                # ✅ Step 3: Display results
-                if results:
-                    st.write("## 🎯 Search Results")
-                    st.table(results)
-                else:
-                    st.error("🚨 No results returned from /VectorSearch.")
-            except Exception as e:
-                st.error(f"🚨 Unexpected error: {str(e)}")
-                traceback.print_exc()
-
-
-if __name__ == "__main__":
+import asyncio
+import traceback  # ✅ Logs full error stack trace for debugging
+
+import httpx
+import orjson
+import streamlit as st
+
+from api_client import coalesce, get_api_endpoint
+
+import urllib3
+
+# st.set_page_config must run on every rerun to keep the wide layout, but the
+# warning-filter mutation only needs to happen once per session, not on every
+# widget interaction.
+st.set_page_config(layout="wide")
+
+if "_vector_search_configured" not in st.session_state:
+    # Suppress insecure HTTPS warnings for local dev/self-signed certs
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    st.session_state["_vector_search_configured"] = True
+
+# Resolve the endpoint and derived URLs once at import rather than on every call.
+API_BASE = get_api_endpoint()
+VECTORIZE_URL = f"{API_BASE}/Vectorize"
+VECTOR_SEARCH_URL = f"{API_BASE}/VectorSearch"
+
+_LIMITS = httpx.Limits(max_keepalive_connections=20)
+
+async def handle_query_vectorization(client: httpx.AsyncClient, query: str) -> list[float]:
+    """
+    Calls /api/Vectorize to convert the user's text query into a float vector.
+    Errors are raised rather than rendered here so failed calls never end up
+    in the pipeline cache.
+    """
+    response = await client.get(VECTORIZE_URL, params={"text": query})
+
+    response.raise_for_status()  # Raise an exception for non-200 responses
+
+    vector = orjson.loads(response.content)
+    if not (isinstance(vector, list) and all(isinstance(x, (int, float)) for x in vector)):
+        raise ValueError("/Vectorize returned an invalid format.")
+    return vector
+
+
+async def handle_vector_search(client: httpx.AsyncClient, query_vector_list: list[float], max_results: int, minimum_similarity_score: float):
+    """
+    Calls /api/VectorSearch with the vectorized query, raising errors to
+    the caller.
+    """
+    # ✅ Send the vector as returned by /Vectorize; JSON encoding preserves
+    # full float precision, so no per-element rounding pass is needed.
+    payload = {
+        "queryVector": query_vector_list,
+        "maxResults": max_results,
+        "minimumSimilarityScore": round(minimum_similarity_score, 2)  # Ensure float format
+    }
+
+    response = await client.post(VECTOR_SEARCH_URL, content=orjson.dumps(payload))
+
+    response.raise_for_status()  # Raise an exception for non-200 responses
+
+    data = orjson.loads(response.content)
+    if not isinstance(data, list):
+        raise ValueError("/VectorSearch returned an invalid format.")
+    return data
+
+
+def _make_client() -> httpx.AsyncClient:
+    """Async client configured for the self-signed local API host."""
+    return httpx.AsyncClient(
+        timeout=30.0,
+        verify=False,
+        limits=_LIMITS,
+        headers={
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        },
+    )
+
+
+async def _run_vectorize(query: str) -> list[float]:
+    async with _make_client() as client:
+        return await handle_query_vectorization(client, query)
+
+
+async def _run_vector_search(query_vector_list: list[float], max_results: int, minimum_similarity_score: float):
+    async with _make_client() as client:
+        return await handle_vector_search(client, query_vector_list, max_results, minimum_similarity_score)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def vectorize_query(query: str) -> list[float]:
+    """
+    Cached sync wrapper for the vectorize stage, keyed on the query alone:
+    adjusting max results or the similarity slider reuses the embedding
+    instead of re-billing the vectorizer. Concurrent duplicates coalesce
+    onto a single in-flight request.
+    """
+    return coalesce(("vectorize", query), lambda: asyncio.run(_run_vectorize(query)))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def run_search_pipeline(query: str, max_results: int, minimum_similarity_score: float):
+    """
+    Cached synchronous entry point for the submit handler. Repeat
+    submissions with the same query and filters skip both network stages,
+    and concurrent duplicates (e.g. a double-click) coalesce onto a
+    single in-flight search.
+    """
+    query_vector_list = vectorize_query(query)
+    if not query_vector_list:
+        raise ValueError("No vector received from /Vectorize. Search cannot continue.")
+    return coalesce(
+        ("vector-search", query, max_results, minimum_similarity_score),
+        lambda: asyncio.run(_run_vector_search(query_vector_list, max_results, minimum_similarity_score)),
+    )
+
+
+def main():
+    """
+    Streamlit page for demonstrating vector search over maintenance requests.
+    """
+    st.title("🔍 Vector Search for Maintenance Requests")
+
+    st.write(
+        """
+        ## How It Works:
+        1️⃣ Enter a search query describing a maintenance issue.  
+        2️⃣ Click **"Submit"** to convert the query into a vector.  
+        3️⃣ The API will return **similar maintenance requests** with similarity scores.  
+        """
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        query = st.text_input("🔎 Enter Search Query:", key="query", value="")
+    with col2:
+        max_results = st.number_input("📊 Max results (0 = all):", min_value=0, value=5)
+
+    minimum_similarity_score = st.slider(
+        "📏 Minimum Similarity Score:",
+        min_value=0.0,
+        max_value=1.0,
+        value=0.8,  # ✅ Reset to production value
+        step=0.01
+    )
+
+    if st.button("🚀 Submit"):
+        if not query.strip():
+            st.warning("⚠️ Please enter a valid query.")
+            return
+
+        with st.spinner("🔄 Performing vector search..."):
+            try:
+                # ✅ Vectorize the query and search in one pipelined call
+                results = run_search_pipeline(query, max_results, minimum_similarity_score)
+
+                # ✅ Display results
+                if results:
+                    st.write("## 🎯 Search Results")
+                    st.table(results)
+                else:
+                    st.error("🚨 No results returned from /VectorSearch.")
+            except httpx.TimeoutException:
+                st.error("🚨 Timeout Error: The API took too long to respond.")
+            except httpx.ConnectError:
+                st.error("🚨 Connection Error: Cannot reach the API.")
+            except Exception as e:
+                st.error(f"🚨 Unexpected error: {str(e)}")
+                traceback.print_exc()
+
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
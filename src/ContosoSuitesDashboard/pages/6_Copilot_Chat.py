@@ -1,57 +1,62 @@
+import re
+from collections import deque
+
+import orjson
 import requests
 import streamlit as st
 
-st.set_page_config(layout="wide")
+from api_client import coalesce, get_api_endpoint, session
 
-def get_api_endpoint():
-    """Retrieve API endpoint and ensure it includes 'https://'."""
-    try:
-        api_endpoint = st.secrets["api"]["endpoint"].strip()
-        if not api_endpoint.startswith("http"):
-            api_endpoint = "https://" + api_endpoint.lstrip("/")
+st.set_page_config(layout="wide")
 
-        # ✅ Ensure API base URL includes `/api/`
-        if not api_endpoint.endswith("/api"):
-            api_endpoint = api_endpoint.rstrip("/") + "/api"
+# Resolve the endpoint and derived URL once at import rather than on every call.
+API_BASE = get_api_endpoint()
+COPILOT_URL = f"{API_BASE}/MaintenanceCopilotChat"
 
-        return api_endpoint
-    except KeyError:
-        st.error("🚨 API endpoint is missing in secrets.toml configuration.")
-        return ""
+# ✅ Matches numbered list markers (1., 2., etc.) at the start of a line
+_NUMBERED_LIST_RE = re.compile(r"(?m)^\s*\d+\.\s?")
 
 def format_response(response_text):
     """Format AI response for better readability."""
     response_text = response_text.replace("\\n", "\n")  # ✅ Convert escaped newlines
     response_text = response_text.replace("\n\n", "\n")  # ✅ Remove extra blank lines
 
-    # ✅ Convert numbered lists (1., 2., etc.) to bullet points (- )
-    for i in range(1, 10):  # Handling up to 10 numbered points
-        response_text = response_text.replace(f"{i}.", "-")
+    # ✅ Convert numbered lists to bullet points in a single regex pass
+    response_text = _NUMBERED_LIST_RE.sub("- ", response_text)
 
     return response_text.strip()  # ✅ Trim spaces for clean output
 
-def send_message_to_copilot(message):
-    """Send a message to the Copilot chat endpoint with proper error handling."""
-    
-    api_endpoint = get_api_endpoint()
-    if not api_endpoint:
-        return "❌ API configuration error."
+def _post_to_copilot(message):
+    """Issue the Copilot POST and format the reply, raising on HTTP errors."""
+    payload = {"message": message}  # ✅ Ensure correct JSON format
 
+    response = session.post(COPILOT_URL, data=orjson.dumps(payload), timeout=30)
+    response.raise_for_status()
+
+    # ✅ Try parsing response as JSON safely
     try:
-        payload = {"message": message}  # ✅ Ensure correct JSON format
-        headers = {"Content-Type": "application/json"}
+        data = orjson.loads(response.content)
+        if isinstance(data, dict) and "message" in data:
+            return format_response(data["message"])  # ✅ Apply formatting
+        return format_response(response.text)  # ✅ Fallback: Clean raw response
+    except ValueError:
+        return format_response(response.text)  # ✅ Directly return API text response
+
+def send_message_to_copilot(message):
+    """Send a message to the Copilot chat endpoint with proper error handling.
+    Deliberately not cached: the Copilot keeps server-side conversation
+    state, so the same text (e.g. \"yes\" or a room number) legitimately
+    recurs with different answers and every turn must reach the agent."""
 
-        response = requests.post(f"{api_endpoint}/MaintenanceCopilotChat", json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
+    if not API_BASE:
+        return "❌ API configuration error."
 
-        # ✅ Try parsing response as JSON safely
-        try:
-            data = response.json()
-            if isinstance(data, dict) and "message" in data:
-                return format_response(data["message"])  # ✅ Apply formatting
-            return format_response(response.text)  # ✅ Fallback: Clean raw response
-        except ValueError:
-            return format_response(response.text)  # ✅ Directly return API text response
+    try:
+        # ✅ Key on the conversation turn as well as the text: the Copilot is
+        # stateful, so the same message at a later turn must go through, while
+        # duplicates of the current turn (e.g. a double submit) still coalesce.
+        turn = len(st.session_state.get("chat_messages", ()))
+        return coalesce(("copilot-chat", turn, message), lambda: _post_to_copilot(message))
 
     except requests.exceptions.Timeout:
         return "🚨 Timeout Error: The Copilot API took too long to respond."
@@ -74,9 +79,10 @@ def main():
         """
     )
 
-    # Initialize chat history
+    # Initialize chat history, bounded to the last 50 messages so memory and
+    # the per-rerun render cost stay flat in long conversations
     if "chat_messages" not in st.session_state:
-        st.session_state.chat_messages = []
+        st.session_state.chat_messages = deque(maxlen=50)
 
     # Display chat messages from history on app rerun
     for message in st.session_state.chat_messages:
@@ -89,18 +95,15 @@ def main():
             st.chat_message("user").markdown(prompt)
             st.session_state.chat_messages.append({"role": "user", "content": prompt})
 
-            # ✅ Send user message to Copilot
+            # ✅ Send user message to Copilot (response is already formatted)
             response = send_message_to_copilot(prompt)
 
-            # ✅ Apply formatting for readability
-            formatted_response = format_response(response)
-
             # ✅ Display assistant response
             with st.chat_message("assistant"):
-                st.markdown(formatted_response)
+                st.markdown(response)
 
             # ✅ Store assistant response in chat history
-            st.session_state.chat_messages.append({"role": "assistant", "content": formatted_response})
+            st.session_state.chat_messages.append({"role": "assistant", "content": response})
 
 if __name__ == "__main__":
     main()
@@ -30,8 +30,13 @@ namespace ContosoSuitesWebAPI.Services
 
             var vectorString = string.Join(", ", queryVector.Select(v => v.ToString(CultureInfo.InvariantCulture)).ToArray());
 
+            // Apply the result limit inside the query so Cosmos DB stops after
+            // max_results rows, instead of shipping every match over the wire
+            // and trimming the list in memory afterwards.
+            var topClause = max_results > 0 ? $"TOP {max_results}" : string.Empty;
+
             var query = $@"
-                SELECT c.hotel_id AS HotelId, c.hotel AS Hotel, c.details AS Details, 
+                SELECT {topClause} c.hotel_id AS HotelId, c.hotel AS Hotel, c.details AS Details,
                 VectorDistance(c.request_vector, [{vectorString}]) AS SimilarityScore
                 FROM c
                 WHERE VectorDistance(c.request_vector, [{vectorString}]) > {minimum_similarity_score.ToString(CultureInfo.InvariantCulture)}
@@ -47,7 +52,7 @@ namespace ContosoSuitesWebAPI.Services
                     results.Add(item);
                 }
             }
-            return max_results > 0 ? results.Take(max_results).ToList() : results;
+            return results;
         }
     }
 }